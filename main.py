@@ -7,15 +7,23 @@ import time
 import logging
 import signal
 import sys
-import atexit
+import fcntl
+import hashlib
+import shelve
 from html import unescape
-from collections import defaultdict
-from typing import Dict, List
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque
 
 from dotenv import load_dotenv
 from mastodon import Mastodon, StreamListener, MastodonMalformedEventError
 from mastodon.errors import MastodonAPIError, MastodonNetworkError, MastodonRatelimitError
 
+try:
+    import orjson  # Optional: faster state file (de)serialization
+except ImportError:
+    orjson = None
+
 from scrabble import (
     calculate_points,
     get_language_name,
@@ -26,25 +34,109 @@ from scrabble import (
     get_unsupported_language_message,
     is_valid_word,
     is_unsupported_language,
+    DEFAULT_LANGUAGE,
+    LANGUAGE_FALLBACKS,
+    LETTER_POINTS,
     SUPPORTED_LANGUAGES
 )
 
 load_dotenv()
 
+
+class JSONLogFormatter(logging.Formatter):
+    """Formats log records as single-line JSON objects (no strftime per record)."""
+
+    def format(self, record):
+        entry = {
+            'ts': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        if orjson:
+            return orjson.dumps(entry).decode()
+        return json.dumps(entry, ensure_ascii=False)
+
+
 # Configure logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL.upper()),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+if LOG_FORMAT == "json":
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(JSONLogFormatter())
+    logging.basicConfig(level=getattr(logging, LOG_LEVEL.upper()), handlers=[log_handler])
+else:
+    logging.basicConfig(
+        level=getattr(logging, LOG_LEVEL.upper()),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
 logger = logging.getLogger("ScrabbleBot")
 
+# Localized error message lookup by error type (see ScrabbleBot.send_error_response)
+ERROR_MESSAGE_FUNCTIONS = {
+    'multiple_words': get_error_message,
+    'invalid_word': get_invalid_word_message,
+    'rate_limited': get_rate_limit_message,
+    'unsupported_language': get_unsupported_language_message
+}
+
+# Pre-compiled patterns used on every incoming status
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+# Linked mentions (<a class="u-url mention">), but not hashtags (<a class="mention hashtag">)
+HTML_MENTION_LINK_RE = re.compile(
+    r'<a\s[^>]*class="(?![^"]*\bhashtag\b)[^"]*\bmention\b[^"]*"[^>]*>.*?</a>',
+    re.DOTALL
+)
+HTML_ENTITY_RE = re.compile(r'&(#?\w+);')
+MENTION_COUNT_RE = re.compile(r'@\s*\w+')
+
+# Conversational indicators in replies to someone else (matched against lowercased text)
+CONVERSATIONAL_PATTERNS = (
+    r'\?',  # Question marks (asking about the bot)
+    r'\bwarum\b', r'\bweshalb\b', r'\bwieso\b',  # German: why
+    r'\bwhy\b', r'\bhow\b', r'\bwhat\b',  # English: question words
+    r'\bpourquoi\b', r'\bcomment\b',  # French: why, how
+    r'\bbot\b.*\b(ist|does|macht|is|fait)',  # Talking about the bot
+    r'\b(danke|thanks|merci)\b',  # Thanking someone
+)
+
+# Phrases indicating discussion about the bot (matched against lowercased text)
+META_PATTERNS = (
+    r'\b(der|die|das)\s+bot\b',  # German: the bot (talking about)
+    r'\b(dieser|diese|dieses)\s+bot\b',  # German: this bot
+    r'\bthe\s+bot\b',  # English: the bot
+    r'\bthis\s+bot\b',  # English: this bot
+    r'\ble\s+bot\b',  # French: the bot
+    r'\bce\s+bot\b',  # French: this bot
+    r'\bbot\s+(ist|is|kann|can|macht|does|hat|has)\b',  # Bot capabilities discussion
+)
+
+# Each pattern group fused into one alternation, so the text is scanned once per group
+CONVERSATIONAL_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in CONVERSATIONAL_PATTERNS))
+META_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in META_PATTERNS))
+# Allow whitespace because strip_html might put spaces between @ and name
+MENTION_RE = re.compile(r'@\s*\w+(?:@[\w.]+)?')
+
+# The entities that show up in Mastodon status HTML; anything else goes through unescape
+HTML_ENTITIES = {'amp': '&', 'lt': '<', 'gt': '>', 'quot': '"', '#39': "'", 'nbsp': '\xa0'}
+
+
+# Fingerprint of the tables calculate_points depends on; a persisted points
+# cache written with different tables is cleared when it is opened
+POINTS_CACHE_VERSION = hashlib.sha256(
+    json.dumps([LETTER_POINTS, LANGUAGE_FALLBACKS, DEFAULT_LANGUAGE], sort_keys=True).encode()
+).hexdigest()
+# Cache entries are keyed "language:word", so this key can't collide with them
+POINTS_CACHE_VERSION_KEY = '__version__'
+
 
 class RateLimiter:
     """Rate limiter using sliding window algorithm."""
 
-    def __init__(self, max_requests: int, time_window: int, enabled: bool = True):
+    def __init__(self, max_requests: int, time_window: int, enabled: bool = True, max_users: int = 100000):
         """
         Initialize rate limiter.
 
@@ -52,11 +144,15 @@ class RateLimiter:
             max_requests: Maximum number of requests allowed in time window
             time_window: Time window in seconds
             enabled: Whether rate limiting is enabled
+            max_users: Maximum number of tracked users (least recently active are evicted)
         """
         self.max_requests = max_requests
         self.time_window = time_window
         self.enabled = enabled
-        self.requests: Dict[str, List[float]] = defaultdict(list)
+        self.max_users = max_users
+        # Ring buffer per user holding the timestamps of the last max_requests allowed requests,
+        # ordered from least to most recently active user
+        self.requests: OrderedDict[str, Deque[float]] = OrderedDict()
 
     def is_allowed(self, user_id: str) -> bool:
         """
@@ -71,45 +167,58 @@ class RateLimiter:
         if not self.enabled:
             return True
 
-        current_time = time.time()
-
-        # Clean up old requests outside the time window
-        self.requests[user_id] = [
-            timestamp for timestamp in self.requests[user_id]
-            if current_time - timestamp < self.time_window
-        ]
-
-        # Check if user is within rate limit
-        if len(self.requests[user_id]) >= self.max_requests:
-            logger.warning(f"Rate limit exceeded for user {user_id}: {len(self.requests[user_id])}/{self.max_requests}")
+        # Monotonic clock: the window is relative and must not jump with NTP adjustments
+        current_time = time.monotonic()
+        timestamps = self.requests.get(user_id)
+        if timestamps is None:
+            timestamps = self.requests[user_id] = deque(maxlen=self.max_requests)
+            # Cap memory during spam waves by evicting the least recently active user
+            while len(self.requests) > self.max_users:
+                self.requests.popitem(last=False)
+        else:
+            self.requests.move_to_end(user_id)
+
+        # The buffer is full and its oldest entry is still inside the window
+        # (an empty full buffer means max_requests is 0)
+        if len(timestamps) >= self.max_requests and (
+            not timestamps or current_time - timestamps[0] < self.time_window
+        ):
+            logger.warning("Rate limit exceeded for user %s: %s/%s", user_id, len(timestamps), self.max_requests)
             return False
 
-        # Add current request
-        self.requests[user_id].append(current_time)
+        # Add current request (a full buffer drops its expired oldest entry)
+        timestamps.append(current_time)
         return True
 
     def cleanup_old_entries(self):
         """Remove entries for users who haven't made requests recently."""
-        current_time = time.time()
-        users_to_remove = []
+        cutoff = time.monotonic() - self.time_window
+        removed = 0
+
+        # Single pass over a snapshot of the keys, deleting in place
+        for user_id in list(self.requests):
+            timestamps = self.requests[user_id]
+
+            # Remove old timestamps (oldest first)
+            while timestamps and timestamps[0] <= cutoff:
+                timestamps.popleft()
 
-        for user_id, timestamps in self.requests.items():
-            # Remove old timestamps
-            self.requests[user_id] = [
-                ts for ts in timestamps
-                if current_time - ts < self.time_window
-            ]
+            if not timestamps:
+                del self.requests[user_id]
+                removed += 1
 
-            # Mark empty entries for removal
-            if not self.requests[user_id]:
-                users_to_remove.append(user_id)
+        if removed:
+            logger.debug("Cleaned up %s user entries from rate limiter", removed)
 
-        # Remove empty entries
-        for user_id in users_to_remove:
-            del self.requests[user_id]
 
-        if users_to_remove:
-            logger.debug(f"Cleaned up {len(users_to_remove)} user entries from rate limiter")
+def get_supported_language(lang_code: str | None, fallback: str = "de") -> str:
+    """Return lang_code if the bot supports it, otherwise the fallback language."""
+    return lang_code if lang_code in SUPPORTED_LANGUAGES else fallback
+
+
+def decode_entity(match: re.Match) -> str:
+    """Decode one HTML entity match, using the small table for the common ones."""
+    return HTML_ENTITIES.get(match.group(1)) or unescape(match.group(0))
 
 
 def format_response(word: str, language: str | None = None, points: int | None = None, detected_lang: str | None = None) -> str:
@@ -140,36 +249,54 @@ class ScrabbleListener(StreamListener):
 
     def __init__(self, bot):
         self.bot = bot
+        # Notification type -> handler; all other types are ignored with one lookup
+        self.notification_handlers = {
+            'mention': self.on_mention,
+        }
         super().__init__()
 
     def on_notification(self, notification):
-        """Handle new notifications (mentions, including filtered and direct)."""
-        if notification['type'] == 'mention':
-            status = notification['status']
-            account_id = str(status['account']['id'])
+        """Dispatch new notifications to the handler for their type."""
+        handler = self.notification_handlers.get(notification.get('type'))
+        if handler:
+            handler(notification)
+
+    def on_mention(self, notification):
+        """Handle mention notifications (including filtered and direct)."""
+        status = notification['status']
+        account = status['account']
+        # Convert the ID once; it is reused as the rate limiter key
+        account_id = str(account['id'])
+
+        # Ignore own notifications (e.g. from own replies)
+        if account_id == self.bot.my_id:
+            return
 
-            # Ignore own notifications (e.g. from own replies)
-            if account_id == self.bot.my_id:
-                return
+        acct = account['acct']
 
-            # Check if this mention should be ignored (citations, conversations, etc.)
-            should_ignore, reason = self.bot.should_ignore_mention(status)
-            if should_ignore:
-                logger.info(f"Ignoring mention from {status['account']['acct']}: {reason}")
-                return
+        # Check if this mention should be ignored (citations, conversations, etc.)
+        should_ignore, reason = self.bot.should_ignore_mention(status)
+        if should_ignore:
+            logger.info("Ignoring mention from %s: %s", acct, reason)
+            return
 
-            visibility = status.get('visibility', 'public')
-            is_filtered = notification.get('filtered') is not None
+        visibility = status.get('visibility', 'public')
+        is_filtered = notification.get('filtered') is not None
 
-            # Log the type of mention
-            if visibility == 'direct':
-                logger.info(f"Notification received: Direct mention from {status['account']['acct']}")
-            elif is_filtered:
-                logger.info(f"Notification received: Filtered mention from {status['account']['acct']}")
-            else:
-                logger.info(f"Notification received: Mention from {status['account']['acct']}")
+        # Log the type of mention
+        if visibility == 'direct':
+            logger.info("Notification received: Direct mention from %s", acct)
+        elif is_filtered:
+            logger.info("Notification received: Filtered mention from %s", acct)
+        else:
+            logger.info("Notification received: Mention from %s", acct)
 
-            self.bot.process_status(status, is_mention=True)
+        self.bot.submit_status(status, is_mention=True, user_id=account_id)
+
+    def handle_heartbeat(self):
+        """Use server keep-alives to flush pending state even when no statuses arrive."""
+        if self.bot.state_dirty:
+            self.bot.executor.submit(self.bot.flush_state)
 
     def _dispatch(self, event):
         """Override _dispatch to ignore empty events (heartbeats)."""
@@ -179,14 +306,14 @@ class ScrabbleListener(StreamListener):
 
     def on_update(self, status):
         """Handle new statuses in home timeline (followed accounts)."""
-        # Only process if monitoring is enabled
-        if not self.bot.bt_account_name:
+        # Only process if monitoring is enabled (the ID is resolved in setup)
+        if self.bot.bt_account_id is None:
             return
 
-        # Check if the status is from the targeted account
-        if status['account']['acct'] == self.bot.bt_account_name:
-            logger.info(f"Update received: Post from @{self.bot.bt_account_name}")
-            self.bot.process_status(status, is_mention=False)
+        # Check if the status is from the targeted account (ID compare, no string hashing)
+        if status['account']['id'] == self.bot.bt_account_id:
+            logger.info("Update received: Post from @%s", self.bot.bt_account_name)
+            self.bot.submit_status(status, is_mention=False)
 
 
 class ScrabbleBot:
@@ -200,11 +327,14 @@ class ScrabbleBot:
         self.access_token = os.getenv("MASTODON_BOT_ACCESS_TOKEN")
         self.reconnect_delay = int(os.getenv("RECONNECT_DELAY_SECONDS", "30"))
         self.max_reconnect_attempts = int(os.getenv("MAX_RECONNECT_ATTEMPTS", "0"))
+        self.state_save_interval = float(os.getenv("STATE_SAVE_INTERVAL_SECONDS", "5"))
+        self.points_cache_file = os.getenv("POINTS_CACHE_FILE")  # Optional: None disables the disk cache
 
         # Rate limiting configuration
         rate_limit_enabled = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
         rate_limit_max = int(os.getenv("RATE_LIMIT_MAX_REQUESTS", "5"))
         rate_limit_window = int(os.getenv("RATE_LIMIT_TIME_WINDOW", "3600"))
+        rate_limit_max_users = int(os.getenv("RATE_LIMIT_MAX_USERS", "100000"))
 
         # Internal state
         self.mastodon = None
@@ -212,14 +342,47 @@ class ScrabbleBot:
         self.my_id = None  # Bot's own account ID
         self.last_mention_id = None
         self.last_bt_id = None
+        self.state_dirty = False  # True if last IDs changed since the last save
+        self.saved_ids = (None, None)  # (mentions, bt_posts) as last written to or read from disk
+        self.last_state_save = 0.0
         self.reconnect_count = 0
         self.shutdown_requested = False
-        self.rate_limiter = RateLimiter(rate_limit_max, rate_limit_window, rate_limit_enabled)
+        self.rate_limiter = RateLimiter(rate_limit_max, rate_limit_window, rate_limit_enabled, rate_limit_max_users)
 
         # In-memory cache of recently processed status IDs to prevent duplicates
+        # (set for O(1) lookups, deque remembers insertion order for eviction)
         self.processed_status_ids = set()
+        self.processed_status_order = deque()
         self.max_processed_cache = 100  # Keep last 100 IDs in memory
 
+        # Persistent cache of calculated points, survives restarts
+        self.points_cache = None
+        self.points_cache_size = 0
+        self.max_points_cache = 50000
+
+        # Statuses are processed on a single worker thread so slow replies don't
+        # stall the stream reader (one worker keeps processing in stream order)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="status-worker")
+
+    def remember_status_id(self, status_id):
+        """Add a status ID to the duplicate cache, evicting the oldest entry when full."""
+        if status_id in self.processed_status_ids:
+            return
+        self.processed_status_ids.add(status_id)
+        self.processed_status_order.append(status_id)
+        if len(self.processed_status_order) > self.max_processed_cache:
+            self.processed_status_ids.discard(self.processed_status_order.popleft())
+
+    def mark_processed(self, status_id, is_mention: bool):
+        """Record a status as processed: advance its last ID, cache it and persist (throttled)."""
+        if is_mention:
+            self.last_mention_id = status_id
+        else:
+            self.last_bt_id = status_id
+        self.remember_status_id(status_id)
+        self.state_dirty = True
+        self.flush_state()  # Throttled; the in-memory cache covers the gap
+
     def send_reply_with_retry(self, status, message, max_retries=3):
         """
         Send a reply with retry logic for transient errors.
@@ -242,32 +405,32 @@ class ScrabbleBot:
 
                 # Add our own reply to processed cache to avoid processing it
                 if reply_status and 'id' in reply_status:
-                    self.processed_status_ids.add(reply_status['id'])
+                    self.remember_status_id(reply_status['id'])
 
                 return True
             except MastodonRatelimitError as e:
                 # Rate limited - wait and retry
-                logger.warning(f"Rate limited, waiting before retry (attempt {attempt + 1}/{max_retries})")
+                logger.warning("Rate limited, waiting before retry (attempt %s/%s)", attempt + 1, max_retries)
                 if attempt < max_retries - 1:
                     time.sleep(5 * (attempt + 1))  # Exponential backoff
                 else:
-                    logger.error(f"Rate limit reached after {max_retries} attempts: {e}")
+                    logger.error("Rate limit reached after %s attempts: %s", max_retries, e)
                     return False
             except MastodonNetworkError as e:
                 # Network error - retry
-                logger.warning(f"Network error, retrying (attempt {attempt + 1}/{max_retries}): {e}")
+                logger.warning("Network error, retrying (attempt %s/%s): %s", attempt + 1, max_retries, e)
                 if attempt < max_retries - 1:
                     time.sleep(2)
                 else:
-                    logger.error(f"Network error after {max_retries} attempts: {e}")
+                    logger.error("Network error after %s attempts: %s", max_retries, e)
                     return False
             except MastodonAPIError as e:
                 # API error - likely not transient, don't retry
-                logger.error(f"API error sending reply: {e}")
+                logger.error("API error sending reply: %s", e)
                 return False
             except Exception as e:
                 # Unknown error
-                logger.error(f"Unknown error sending reply: {e}")
+                logger.error("Unknown error sending reply: %s", e)
                 return False
 
         return False
@@ -286,36 +449,25 @@ class ScrabbleBot:
             bool: True if successful, False otherwise
         """
         # Get and validate post language
-        if override_lang:
-            post_lang = override_lang
-        else:
-            post_lang = status.get("language", "de")
-            if post_lang not in SUPPORTED_LANGUAGES:
-                post_lang = "de"
+        post_lang = override_lang or get_supported_language(status.get("language"))
 
         # Get appropriate error message function
-        error_msg_functions = {
-            'multiple_words': get_error_message,
-            'invalid_word': get_invalid_word_message,
-            'rate_limited': get_rate_limit_message,
-            'unsupported_language': get_unsupported_language_message
-        }
-
-        if error_type not in error_msg_functions:
-            logger.error(f"Unknown error type: {error_type}")
+        get_message = ERROR_MESSAGE_FUNCTIONS.get(error_type)
+        if get_message is None:
+            logger.error("Unknown error type: %s", error_type)
             return False
 
-        error_msg = error_msg_functions[error_type](post_lang)
+        error_msg = get_message(post_lang)
 
         # Send error message
         if self.send_reply_with_retry(status, error_msg):
-            log_msg = f"{error_type} error sent"
             if context:
-                log_msg += f": {context}"
-            logger.info(log_msg)
+                logger.info("%s error sent: %s", error_type, context)
+            else:
+                logger.info("%s error sent", error_type)
             return True
         else:
-            logger.error(f"Could not send {error_type} error message")
+            logger.error("Could not send %s error message", error_type)
             return False
 
     def get_backoff_delay(self, count: int, is_malformed: bool = False) -> int:
@@ -353,55 +505,137 @@ class ScrabbleBot:
         try:
             my_account = self.mastodon.account_verify_credentials()
             self.my_id = str(my_account["id"])
-            logger.info(f"Bot running as @{my_account['username']} (ID: {self.my_id})")
+            logger.info("Bot running as @%s (ID: %s)", my_account['username'], self.my_id)
         except Exception as e:
-            logger.error(f"Error fetching bot credentials: {e}")
+            logger.error("Error fetching bot credentials: %s", e)
             return False
 
         # Get the account ID of the target using public lookup (optional)
         # (access token has limited scopes, so we use unauthenticated lookup)
         if self.bt_account_name:
             try:
-                public_mastodon = Mastodon(api_base_url=self.mastodon_instance)
+                # Share the HTTP session (and its keep-alive connection pool) with the main client
+                public_mastodon = Mastodon(api_base_url=self.mastodon_instance, session=self.mastodon.session)
                 target_account = public_mastodon.account_lookup(self.bt_account_name)
                 self.bt_account_id = target_account["id"]
-                logger.info(f"Account @{self.bt_account_name} found (ID: {self.bt_account_id}) - Monitoring enabled")
+                logger.info("Account @%s found (ID: %s) - Monitoring enabled", self.bt_account_name, self.bt_account_id)
             except Exception as e:
-                logger.error(f"Error: Account @{self.bt_account_name} not found: {e}")
+                logger.error("Error: Account @%s not found: %s", self.bt_account_name, e)
                 return False
         else:
             logger.info("No account configured for monitoring - mention-only mode active")
 
         # Load persistence state
         self.load_state()
+        # The cache is only used by the status worker, and sqlite-backed shelves
+        # must stay on the thread that opened them
+        self.executor.submit(self.open_points_cache).result()
         return True
 
     def load_state(self):
         """Load last processed IDs."""
         if os.path.exists(self.last_ids_file):
             try:
-                with open(self.last_ids_file, 'r') as f:
-                    state = json.load(f)
-                    self.last_mention_id = state.get("mentions")
-                    self.last_bt_id = state.get("bt_posts")
+                with open(self.last_ids_file, 'rb') as f:
+                    data = f.read()
+                state = orjson.loads(data) if orjson else json.loads(data)
+                self.last_mention_id = state.get("mentions")
+                self.last_bt_id = state.get("bt_posts")
+                self.saved_ids = (self.last_mention_id, self.last_bt_id)
             except (json.JSONDecodeError, IOError):
                 logger.warning("Could not load last IDs, using default values")
 
+    def open_points_cache(self):
+        """Open the persistent points cache if configured."""
+        if not self.points_cache_file:
+            return
+        try:
+            self.points_cache = shelve.open(self.points_cache_file)
+            if self.points_cache.get(POINTS_CACHE_VERSION_KEY) != POINTS_CACHE_VERSION:
+                if len(self.points_cache):
+                    logger.info("Scoring tables changed, clearing points cache")
+                self.points_cache.clear()
+                self.points_cache[POINTS_CACHE_VERSION_KEY] = POINTS_CACHE_VERSION
+            self.points_cache_size = len(self.points_cache) - 1
+            logger.info("Points cache loaded with %s entries", self.points_cache_size)
+        except Exception as e:
+            logger.warning("Could not open points cache, continuing without it: %s", e)
+            self.points_cache = None
+
+    def close_points_cache(self):
+        """Close the persistent points cache."""
+        if self.points_cache is not None:
+            self.points_cache.close()
+            self.points_cache = None
+
+    def get_points(self, word: str, language: str | None = None) -> tuple[int, str]:
+        """
+        Calculate points for a word, using the persistent cache if enabled.
+
+        Returns:
+            tuple: (points, language_code) as returned by calculate_points
+        """
+        if self.points_cache is None:
+            return calculate_points(word, language)
+
+        # Keep the original casing, language detection depends on it
+        key = f"{language or ''}:{word}"
+        cached = self.points_cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = calculate_points(word, language)
+        if self.points_cache_size < self.max_points_cache:
+            self.points_cache[key] = result
+            self.points_cache_size += 1
+        return result
+
     def save_state(self):
-        """Save last processed IDs."""
+        """Save last processed IDs atomically (write temp file, then rename)."""
+        tmp_file = self.last_ids_file + ".tmp"
         try:
-            with open(self.last_ids_file, 'w') as f:
-                json.dump({
-                    "mentions": self.last_mention_id,
-                    "bt_posts": self.last_bt_id
-                }, f)
+            state = {
+                "mentions": self.last_mention_id,
+                "bt_posts": self.last_bt_id
+            }
+            with open(tmp_file, 'wb') as f:
+                f.write(orjson.dumps(state) if orjson else json.dumps(state).encode())
+            os.replace(tmp_file, self.last_ids_file)
+            self.saved_ids = (self.last_mention_id, self.last_bt_id)
+            self.state_dirty = False
+            self.last_state_save = time.monotonic()
         except IOError as e:
-            logger.error(f"Error saving IDs: {e}")
+            logger.error("Error saving IDs: %s", e)
+
+    def flush_state(self, force: bool = False):
+        """
+        Save state if it changed, at most once per save interval.
+
+        Args:
+            force: Save pending changes regardless of the save interval
+        """
+        if not self.state_dirty:
+            return
+        if (self.last_mention_id, self.last_bt_id) == self.saved_ids:
+            self.state_dirty = False  # Nothing changed on disk, skip the write
+            return
+        if not force and time.monotonic() - self.last_state_save < self.state_save_interval:
+            return
+        self.save_state()
 
-    def strip_html(self, text: str) -> str:
-        """Remove HTML tags and decode entities."""
-        text = re.sub(r'<[^>]+>', ' ', text)
-        text = unescape(text)
+    def strip_html(self, text: str, skip_mentions: bool = False) -> str:
+        """
+        Remove HTML tags and decode entities.
+
+        Args:
+            text: HTML content of a status
+            skip_mentions: Drop linked mentions entirely (hashtags are kept)
+        """
+        if skip_mentions:
+            text = HTML_MENTION_LINK_RE.sub(' ', text)
+        text = HTML_TAG_RE.sub(' ', text)
+        if '&' in text:
+            text = HTML_ENTITY_RE.sub(decode_entity, text)
         return text.strip()
 
     def should_ignore_mention(self, status) -> tuple[bool, str]:
@@ -414,17 +648,23 @@ class ScrabbleBot:
                 - reason: Human-readable reason for ignoring
         """
         # Check if this is a quote/citation of the bot's own post
-        if 'quote' in status and status['quote']:
-            quoted_account_id = str(status['quote']['account']['id'])
+        quote = status.get('quote')
+        if quote:
+            quoted_account_id = str(quote['account']['id'])
             if quoted_account_id == self.my_id:
                 return True, "quoting bot's own post"
 
         # Check if status has a reblog field (boosting bot's post with comment)
-        if 'reblog' in status and status['reblog']:
-            reblog_account_id = str(status['reblog']['account']['id'])
+        reblog = status.get('reblog')
+        if reblog:
+            reblog_account_id = str(reblog['account']['id'])
             if reblog_account_id == self.my_id:
                 return True, "reblogging/boosting bot's post"
 
+        # Strip and lowercase the content once for all checks below
+        content = self.strip_html(status['content'])
+        content_lower = content.lower()
+
         # Check if this is a reply to someone else (not the bot or original post)
         reply_to_account = status.get('in_reply_to_account_id')
         if reply_to_account:
@@ -432,54 +672,30 @@ class ScrabbleBot:
             # If replying to someone else, check if this is conversational
             if reply_to_account_id != self.my_id:
                 # This is a reply in a thread with someone else
-                content = self.strip_html(status['content']).lower()
-
                 # If the post has conversational indicators, likely not a score request
-                conversational_patterns = [
-                    r'\?',  # Question marks (asking about the bot)
-                    r'\bwarum\b', r'\bweshalb\b', r'\bwieso\b',  # German: why
-                    r'\bwhy\b', r'\bhow\b', r'\bwhat\b',  # English: question words
-                    r'\bpourquoi\b', r'\bcomment\b',  # French: why, how
-                    r'\bbot\b.*\b(ist|does|macht|is|fait)',  # Talking about the bot
-                    r'\b(danke|thanks|merci)\b',  # Thanking someone
-                ]
-
-                for pattern in conversational_patterns:
-                    if re.search(pattern, content):
-                        return True, "conversational reply in thread"
+                if CONVERSATIONAL_RE.search(content_lower):
+                    return True, "conversational reply in thread"
 
         # Check for meta-discussion patterns (talking about the bot, not to it)
-        content = self.strip_html(status['content'])
-        content_lower = content.lower()
 
         # Count mentions - if multiple bots/people are mentioned, likely a discussion
-        mention_count = len(re.findall(r'@\s*\w+', content))
-        if mention_count > 2:  # More than 2 mentions suggests group discussion
+        # The '@' count is an upper bound, so the regex only runs when it could exceed 2
+        if content.count('@') > 2 and len(MENTION_COUNT_RE.findall(content)) > 2:
             return True, "group discussion with multiple mentions"
 
         # Check for phrases indicating discussion about the bot
-        meta_patterns = [
-            r'\b(der|die|das)\s+bot\b',  # German: the bot (talking about)
-            r'\b(dieser|diese|dieses)\s+bot\b',  # German: this bot
-            r'\bthe\s+bot\b',  # English: the bot
-            r'\bthis\s+bot\b',  # English: this bot
-            r'\ble\s+bot\b',  # French: the bot
-            r'\bce\s+bot\b',  # French: this bot
-            r'\bbot\s+(ist|is|kann|can|macht|does|hat|has)\b',  # Bot capabilities discussion
-        ]
-
-        for pattern in meta_patterns:
-            if re.search(pattern, content_lower):
-                # Double-check: if there's ONLY the mention and a single word, it's likely a score request
-                text_without_mentions = re.sub(r'@\s*\w+(@[\w.]+)?', '', content)
-                words = text_without_mentions.split()
-                clean_words = [w for w in words if w and not w.startswith('#')]
-
-                # If after removing mentions there's exactly 1 word, it's a score request
-                if len(clean_words) == 1:
-                    return False, ""
-
-                return True, "meta-discussion about the bot"
+        # Every meta pattern contains "bot", so the substring test gates the regex scan
+        if 'bot' in content_lower and META_RE.search(content_lower):
+            # Double-check: if there's ONLY the mention and a single word, it's likely a score request
+            text_without_mentions = MENTION_RE.sub('', content)
+            words = text_without_mentions.split()
+            clean_words = [w for w in words if w and not w.startswith('#')]
+
+            # If after removing mentions there's exactly 1 word, it's a score request
+            if len(clean_words) == 1:
+                return False, ""
+
+            return True, "meta-discussion about the bot"
 
         return False, ""
 
@@ -492,88 +708,112 @@ class ScrabbleBot:
                 - word: First word found or None
                 - has_multiple_words: True if more than one word was found
         """
-        text = self.strip_html(content)
-        # Remove @mentions (allow whitespace because strip_html might put spaces between @ and name)
-        text = re.sub(r'@\s*\w+(@[\w.]+)?', '', text)
-        tokens = text.split()
-
-        if not tokens:
-            return None, False
-
-        # Separate normal words and hashtags
-        hashtags = [t for t in tokens if t.startswith('#')]
-        words = [t for t in tokens if not t.startswith('#')]
+        # Linked mentions are dropped by strip_html, plain-text @handles here
+        # (including "@ name" left over from unlinked or unclassed <span> markup)
+        text = self.strip_html(content, skip_mentions=True)
+        if '@' in text:
+            text = MENTION_RE.sub('', text)
+
+        # Single pass: remember the first word and first hashtag, stop at a second word
+        first_word = first_hashtag = None
+        hashtag_count = 0
+        for token in text.split():
+            if token.startswith('#'):
+                if first_hashtag is None:
+                    first_hashtag = token
+                hashtag_count += 1
+            elif first_word is None:
+                first_word = token
+            else:
+                # A second word decides the result, hashtags no longer matter
+                return first_word, True
 
         # "In parsing, always ignore hashtags if there is one valid word."
-        if words:
-            return words[0], len(words) > 1
+        if first_word is not None:
+            return first_word, False
 
         # "If the hashtag is the only word, remove the hashtag character and process it like a normal word."
-        if hashtags:
-            cleaned_hashtag = hashtags[0].lstrip('#')
-            return cleaned_hashtag, len(hashtags) > 1
+        if first_hashtag is not None:
+            return first_hashtag.lstrip('#'), hashtag_count > 1
 
         return None, False
 
+    def get_single_word(self, content: str) -> str | None:
+        """Return the word if the content is exactly one word, otherwise None."""
+        # Cheap pre-check: more spaces than the tag attributes of a one-word
+        # post would need mean several words
+        if content.count(' ') > 40:
+            return None
+
+        text = self.strip_html(content)
+        # Stop after the second token instead of tokenizing the whole post
+        tokens = text.split(maxsplit=1)
+        return tokens[0] if len(tokens) == 1 else None
+
     def is_single_word(self, content: str) -> bool:
         """Check if the content is exactly one word."""
-        text = self.strip_html(content)
-        words = text.split()
-        return len(words) == 1
+        return self.get_single_word(content) is not None
+
+    def submit_status(self, status, is_mention=False, user_id=None):
+        """Queue a status for processing on the worker thread."""
+        self.executor.submit(self._process_status_safely, status, is_mention, user_id)
+
+    def _process_status_safely(self, status, is_mention, user_id=None):
+        """Process a status, logging errors that would otherwise be lost in the executor."""
+        try:
+            self.process_status(status, is_mention=is_mention, user_id=user_id)
+        except Exception as e:
+            logger.exception("Error processing status %s: %s", status.get('id'), e)
+
+    def process_status(self, status, is_mention=False, user_id=None):
+        """
+        Process a status and reply if it contains a word.
 
-    def process_status(self, status, is_mention=False):
-        """Process a status and reply if it contains a word."""
+        Args:
+            status: The status to process
+            is_mention: Whether the status came in as a mention
+            user_id: Author ID as a string, if the caller already converted it
+        """
         status_id = status["id"]
 
         # Check if we already processed this status (in-memory cache)
         if status_id in self.processed_status_ids:
-            logger.debug(f"Status {status_id} already processed (in cache), skipping")
+            logger.debug("Status %s already processed (in cache), skipping", status_id)
             return
 
         # Avoid processing older items if we have a state (safety check for stream glitches)
         if is_mention and self.last_mention_id and status_id <= self.last_mention_id:
-            logger.debug(f"Status {status_id} older than last_mention_id {self.last_mention_id}, skipping")
+            logger.debug("Status %s older than last_mention_id %s, skipping", status_id, self.last_mention_id)
             return
         if not is_mention and self.last_bt_id and status_id <= self.last_bt_id:
-            logger.debug(f"Status {status_id} older than last_bt_id {self.last_bt_id}, skipping")
+            logger.debug("Status %s older than last_bt_id %s, skipping", status_id, self.last_bt_id)
             return
 
         content = status["content"]
         word = None
         has_multiple_words = False
-        user_id = str(status["account"]["id"])
 
         if is_mention:
+            if user_id is None:
+                user_id = str(status["account"]["id"])
             word, has_multiple_words = self.extract_word(content)
 
             # Mark as processed BEFORE doing anything else
-            self.last_mention_id = status_id
-            self.processed_status_ids.add(status_id)
-            self.save_state()  # Save immediately to prevent reprocessing
-
-            # Trim cache if it gets too large
-            if len(self.processed_status_ids) > self.max_processed_cache:
-                # Remove oldest entries (convert to sorted list, remove first half)
-                sorted_ids = sorted(self.processed_status_ids)
-                self.processed_status_ids = set(sorted_ids[self.max_processed_cache // 2:])
+            self.mark_processed(status_id, is_mention=True)
 
             # Check rate limit for mentions (only rate limit mentions, not bt_first_said posts)
             if not self.rate_limiter.is_allowed(user_id):
                 self.send_error_response(status, 'rate_limited', f"user {user_id}")
                 return
 
-        elif self.is_single_word(content):
-            word = self.strip_html(content).strip()
+        else:
+            # Strip the HTML only once: the single word is returned directly
+            word = self.get_single_word(content)
+            if word is None:
+                return
 
             # Mark as processed BEFORE doing anything else
-            self.last_bt_id = status_id
-            self.processed_status_ids.add(status_id)
-            self.save_state()  # Save immediately to prevent reprocessing
-
-            # Trim cache if it gets too large
-            if len(self.processed_status_ids) > self.max_processed_cache:
-                sorted_ids = sorted(self.processed_status_ids)
-                self.processed_status_ids = set(sorted_ids[self.max_processed_cache // 2:])
+            self.mark_processed(status_id, is_mention=False)
 
         # Handle multiple words error for mentions
         if is_mention and has_multiple_words:
@@ -588,12 +828,12 @@ class ScrabbleBot:
 
             # Word is valid, calculate points and respond
             post_lang = status.get("language")
-            points, detected_lang = calculate_points(word, post_lang)
+            points, detected_lang = self.get_points(word, post_lang)
 
             # Check if word is in an unsupported language (0 points + unsupported chars)
             if is_unsupported_language(word, points):
                 # Use post language if available, otherwise use detected language
-                error_lang = post_lang if post_lang and post_lang in SUPPORTED_LANGUAGES else detected_lang
+                error_lang = get_supported_language(post_lang, detected_lang)
                 self.send_error_response(status, 'unsupported_language', f"word '{word}'", override_lang=error_lang)
                 return
 
@@ -601,15 +841,17 @@ class ScrabbleBot:
             response = format_response(word, post_lang, points, detected_lang)
 
             if self.send_reply_with_retry(status, response):
-                logger.info(f"Response sent: {word} -> {response}")
+                logger.info("Response sent: %s -> %s", word, response)
             else:
-                logger.error(f"Could not send response for word: {word}")
+                logger.error("Could not send response for word: %s", word)
 
     def shutdown(self):
         """Gracefully shutdown the bot."""
         logger.info("Graceful shutdown initiated...")
         self.shutdown_requested = True
-        self.save_state()
+        self.executor.submit(self.close_points_cache)  # Queued after pending statuses
+        self.executor.shutdown(wait=True)  # Finish queued statuses before saving
+        self.flush_state(force=True)
         logger.info("Bot shutdown successfully")
 
     def run(self):
@@ -620,18 +862,19 @@ class ScrabbleBot:
         logger.info("Bot started. Switching to real-time streaming...")
         listener = ScrabbleListener(self)
 
-        # Track last cleanup time for rate limiter
-        last_cleanup = time.time()
+        # Deadline for the next rate limiter cleanup
         cleanup_interval = 3600  # Cleanup every hour
+        next_cleanup = time.monotonic() + cleanup_interval
 
         # Track consecutive errors for specialized backoff
         consecutive_malformed_errors = 0
 
         while not self.shutdown_requested:
-            # Periodic cleanup of rate limiter
-            if time.time() - last_cleanup > cleanup_interval:
-                self.rate_limiter.cleanup_old_entries()
-                last_cleanup = time.time()
+            # Periodic cleanup of rate limiter, on the worker that owns its state
+            now = time.monotonic()
+            if now >= next_cleanup:
+                self.executor.submit(self.rate_limiter.cleanup_old_entries)
+                next_cleanup = now + cleanup_interval
 
             try:
                 # This call blocks while the stream is open
@@ -650,8 +893,8 @@ class ScrabbleBot:
                 consecutive_malformed_errors += 1
                 delay = self.get_backoff_delay(consecutive_malformed_errors, is_malformed=True)
                 
-                logger.warning(f"Malformed event in stream (attempt {consecutive_malformed_errors}): {e}")
-                logger.info(f"Reconnecting in {delay} seconds...")
+                logger.warning("Malformed event in stream (attempt %s): %s", consecutive_malformed_errors, e)
+                logger.info("Reconnecting in %s seconds...", delay)
                 time.sleep(delay)
                 continue
             except Exception as e:
@@ -663,52 +906,41 @@ class ScrabbleBot:
                 
                 delay = self.get_backoff_delay(self.reconnect_count, is_malformed=False)
                 
-                logger.error(f"Stream connection closed: {e} (attempt {self.reconnect_count})")
-                logger.info(f"Reconnecting in {delay} seconds...")
+                logger.error("Stream connection closed: %s (attempt %s)", e, self.reconnect_count)
+                logger.info("Reconnecting in %s seconds...", delay)
                 time.sleep(delay)
 
         self.shutdown()
 
 
+# Kept open for the lifetime of the process, closing it would release the lock
+pid_lock_fd = None
+
+
 def check_single_instance():
     """Ensure only one instance of the bot is running."""
+    global pid_lock_fd
     pid_file = "/tmp/scrabble-bot.pid"
 
-    # Check if PID file exists
-    if os.path.exists(pid_file):
+    # Hold an exclusive lock on the PID file instead of trusting its contents:
+    # the kernel drops the lock when the process dies, so a file left behind
+    # by a crashed instance never blocks a restart, and the file is never
+    # deleted (a new file would let a second instance lock a different inode)
+    fd = os.open(pid_file, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
         try:
-            with open(pid_file, 'r') as f:
-                old_pid = int(f.read().strip())
+            old_pid = os.read(fd, 32).decode().strip() or "unknown"
+        except (OSError, UnicodeDecodeError):
+            old_pid = "unknown"
+        os.close(fd)
+        logger.error("Bot is already running (PID: %s)", old_pid)
+        sys.exit(1)
 
-            # Check if process is still running
-            try:
-                os.kill(old_pid, 0)  # Signal 0 checks if process exists
-                logger.error(f"Bot is already running (PID: {old_pid})")
-                sys.exit(1)
-            except OSError:
-                # Process doesn't exist, remove stale PID file
-                logger.warning(f"Stale PID file found, removing it")
-                os.remove(pid_file)
-        except (ValueError, IOError) as e:
-            logger.warning(f"Could not read PID file: {e}")
-            os.remove(pid_file)
-
-    # Write our PID
-    with open(pid_file, 'w') as f:
-        f.write(str(os.getpid()))
-
-    # Register cleanup
-    def cleanup_pid():
-        try:
-            if os.path.exists(pid_file):
-                with open(pid_file, 'r') as f:
-                    stored_pid = int(f.read().strip())
-                if stored_pid == os.getpid():
-                    os.remove(pid_file)
-        except:
-            pass
-
-    atexit.register(cleanup_pid)
+    os.ftruncate(fd, 0)
+    os.write(fd, str(os.getpid()).encode())
+    pid_lock_fd = fd
 
 
 if __name__ == "__main__":
@@ -717,25 +949,11 @@ if __name__ == "__main__":
 
     bot = ScrabbleBot()
 
-    # PID file path (must match check_single_instance)
-    pid_file = "/tmp/scrabble-bot.pid"
-
     # Setup signal handlers for graceful shutdown
     def signal_handler(sig, frame):
-        logger.info(f"Signal {sig} received, shutting down bot gracefully...")
+        logger.info("Signal %s received, shutting down bot gracefully...", sig)
         bot.shutdown_requested = True
 
-        # Clean up PID file immediately to allow new instance to start
-        try:
-            if os.path.exists(pid_file):
-                with open(pid_file, 'r') as f:
-                    stored_pid = int(f.read().strip())
-                if stored_pid == os.getpid():
-                    os.remove(pid_file)
-                    logger.info("PID file removed")
-        except Exception as e:
-            logger.warning(f"Could not remove PID file: {e}")
-
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
@@ -1,6 +1,8 @@
 """Multi-language Scrabble point calculation with language detection."""
 
 import os
+import re
+from functools import lru_cache
 from dotenv import load_dotenv
 from langdetect import detect, DetectorFactory, LangDetectException
 
@@ -248,10 +250,25 @@ LANGUAGE_FALLBACKS = {
 # Supported languages - extracted for reuse across modules
 SUPPORTED_LANGUAGES = frozenset(LETTER_POINTS.keys())
 
+# All characters from all supported alphabets, for has_supported_characters
+ALL_SUPPORTED_CHARS = frozenset(
+    char.upper() for lang_points in LETTER_POINTS.values() for char in lang_points
+)
+
+# Cyrillic block, scanned by the regex engine instead of a per-character loop
+CYRILLIC_RE = re.compile('[\u0400-\u04FF]')
+
+# Byte translation tables for ASCII words: each byte maps to its point value
+# (upper and lower case alike), so scoring is a bytes.translate plus sum
+ASCII_POINT_TABLES = {
+    lang: bytes(points.get(chr(i).upper(), 0) if i < 128 else 0 for i in range(256))
+    for lang, points in LETTER_POINTS.items()
+}
+
 
 def has_cyrillic(text: str) -> bool:
     """Check if text contains Cyrillic characters."""
-    return any('\u0400' <= char <= '\u04FF' for char in text)
+    return CYRILLIC_RE.search(text) is not None
 
 
 def detect_language(text: str) -> str:
@@ -272,12 +289,14 @@ def detect_language(text: str) -> str:
         return DEFAULT_LANGUAGE
 
 
+@lru_cache(maxsize=4096)
 def calculate_points(word: str, language: str | None = None) -> tuple[int, str]:
     """
     Calculate Scrabble points for a word.
 
     Returns a tuple of (points, language_code).
     If language is not specified, it will be detected.
+    Results are memoized, since the same words are requested repeatedly.
     """
     if language is None:
         language = detect_language(word)
@@ -285,6 +304,10 @@ def calculate_points(word: str, language: str | None = None) -> tuple[int, str]:
     if language not in LETTER_POINTS:
         language = DEFAULT_LANGUAGE
 
+    # ASCII fast path: no Unicode upper-casing and no per-character dict lookup
+    if word.isascii():
+        return sum(word.encode('ascii').translate(ASCII_POINT_TABLES[language])), language
+
     points_map = LETTER_POINTS[language]
     total = 0
     for char in word.upper():
@@ -341,7 +364,7 @@ def is_valid_word(word: str) -> bool:
 
     # Allow only letters (unicode category L*) and hyphens/apostrophes for compound words
     # Remove common punctuation that might be valid in some languages
-    cleaned = word.replace('-', '').replace("'", '').replace("'", '')
+    cleaned = word.replace('-', '').replace("'", '')
 
     return cleaned.isalpha() and len(cleaned) > 0
 
@@ -356,14 +379,9 @@ def has_supported_characters(word: str) -> bool:
     if not word:
         return False
 
-    # Collect all characters from all supported alphabets
-    all_supported_chars = set()
-    for lang_points in LETTER_POINTS.values():
-        all_supported_chars.update(char.upper() for char in lang_points.keys())
-
     # Check if at least 50% of the characters are in our supported sets
     word_upper = word.upper()
-    supported_count = sum(1 for char in word_upper if char in all_supported_chars)
+    supported_count = sum(1 for char in word_upper if char in ALL_SUPPORTED_CHARS)
 
     # If more than half the characters aren't supported, it's likely an unsupported language
     return supported_count > len(word_upper) * 0.5
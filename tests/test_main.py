@@ -1,7 +1,10 @@
 """Unit tests for main.py module."""
 
+import json
+import logging
+
 import pytest
-from main import ScrabbleBot, format_response
+from main import JSONLogFormatter, ScrabbleBot, ScrabbleListener, format_response, get_supported_language
 
 
 class TestFormatResponse:
@@ -28,6 +31,33 @@ class TestFormatResponse:
         assert "Scrabble" in response
 
 
+class TestJSONLogFormatter:
+    """Tests for JSONLogFormatter."""
+
+    def test_format_is_json_line(self):
+        """Test that records are rendered as one JSON object with the formatted message."""
+        record = logging.LogRecord("ScrabbleBot", logging.INFO, __file__, 1, "Response sent: %s", ("HAUS",), None)
+        line = JSONLogFormatter().format(record)
+        assert "\n" not in line
+        entry = json.loads(line)
+        assert entry["level"] == "INFO"
+        assert entry["msg"] == "Response sent: HAUS"
+
+
+class TestGetSupportedLanguage:
+    """Tests for get_supported_language function."""
+
+    def test_supported_language(self):
+        """Test that supported languages are returned unchanged."""
+        assert get_supported_language("en") == "en"
+
+    def test_unsupported_or_missing_language(self):
+        """Test fallback for unsupported or missing languages."""
+        assert get_supported_language("ja") == "de"
+        assert get_supported_language(None) == "de"
+        assert get_supported_language(None, "fr") == "fr"
+
+
 class TestScrabbleBot:
     """Tests for ScrabbleBot class."""
 
@@ -54,6 +84,31 @@ class TestScrabbleBot:
         result = bot.strip_html(text)
         assert result == '<Hello> & "World"'
 
+    def test_extract_word_linked_mention(self):
+        """Test that linked mentions from Mastodon HTML are dropped."""
+        bot = ScrabbleBot()
+        content = (
+            '<p><span class="h-card"><a href="https://example.social/@bot" '
+            'class="u-url mention">@<span>bot</span></a></span> Haus</p>'
+        )
+        word, has_multiple = bot.extract_word(content)
+        assert word == "Haus"
+        assert has_multiple is False
+
+    def test_extract_word_unlinked_span_mention(self):
+        """Test that an unlinked @<span> mention is dropped."""
+        bot = ScrabbleBot()
+        word, has_multiple = bot.extract_word('<p>@<span>bot</span> Haus</p>')
+        assert word == "Haus"
+        assert has_multiple is False
+
+    def test_extract_word_link_without_mention_class(self):
+        """Test that a mention link without the mention class is dropped."""
+        bot = ScrabbleBot()
+        word, has_multiple = bot.extract_word('<p><a href="x">@<span>bot</span></a> Haus</p>')
+        assert word == "Haus"
+        assert has_multiple is False
+
     def test_extract_word_single(self):
         """Test extracting single word from mention."""
         bot = ScrabbleBot()
@@ -75,6 +130,13 @@ class TestScrabbleBot:
         assert word is None
         assert has_multiple is False
 
+    def test_extract_word_hashtags(self):
+        """Test that hashtags are ignored next to a word and used when alone."""
+        bot = ScrabbleBot()
+        assert bot.extract_word("@bot #tag hello") == ("hello", False)
+        assert bot.extract_word("@bot #tag") == ("tag", False)
+        assert bot.extract_word("@bot #one #two") == ("one", True)
+
     def test_extract_word_multiple_mentions(self):
         """Test extraction with multiple mentions."""
         bot = ScrabbleBot()
@@ -92,11 +154,44 @@ class TestScrabbleBot:
         bot = ScrabbleBot()
         assert bot.is_single_word("<p>Hello World</p>") is False
 
+    def test_is_single_word_paragraphs(self):
+        """Test that words split by paragraphs or line breaks are not one word."""
+        bot = ScrabbleBot()
+        assert bot.is_single_word("<p>Hello</p><p>World</p>") is False
+        assert bot.is_single_word("<p>Hello<br />World</p>") is False
+
+    def test_get_single_word_trailing_break(self):
+        """Test that a single word followed by a line break is still accepted."""
+        bot = ScrabbleBot()
+        assert bot.get_single_word("<p>Haus<br></p>") == "Haus"
+        assert bot.get_single_word("<p>Haus</p><p></p>") == "Haus"
+
     def test_is_single_word_empty(self):
         """Test empty content."""
         bot = ScrabbleBot()
         assert bot.is_single_word("") is False
 
+    def test_remember_status_id_evicts_oldest(self):
+        """Test the duplicate cache stays bounded and evicts oldest IDs first."""
+        bot = ScrabbleBot()
+        bot.max_processed_cache = 3
+        for status_id in range(1, 6):
+            bot.remember_status_id(status_id)
+
+        assert bot.processed_status_ids == {3, 4, 5}
+        assert len(bot.processed_status_order) == 3
+
+    def test_submit_status_runs_on_worker(self, mocker):
+        """Test that submitted statuses are processed by the worker thread."""
+        bot = ScrabbleBot()
+        process = mocker.patch.object(bot, "process_status")
+        status = {"id": 1}
+
+        bot.submit_status(status, is_mention=True, user_id="42")
+        bot.executor.shutdown(wait=True)
+
+        process.assert_called_once_with(status, is_mention=True, user_id="42")
+
     def test_shutdown_sets_flag(self):
         """Test shutdown sets the shutdown_requested flag."""
         bot = ScrabbleBot()
@@ -105,6 +200,47 @@ class TestScrabbleBot:
         assert bot.shutdown_requested is True
 
 
+class TestScrabbleListener:
+    """Tests for ScrabbleListener event handling."""
+
+    def test_on_update_matches_monitored_account_id(self, mocker):
+        """Test that only posts from the monitored account ID are processed."""
+        bot = ScrabbleBot()
+        bot.bt_account_name = "bt_first_said"
+        bot.bt_account_id = 42
+        submit = mocker.patch.object(bot, "submit_status")
+        listener = ScrabbleListener(bot)
+
+        listener.on_update({'account': {'id': 7, 'acct': 'someone'}})
+        submit.assert_not_called()
+
+        status = {'account': {'id': 42, 'acct': 'bt_first_said'}}
+        listener.on_update(status)
+        submit.assert_called_once_with(status, is_mention=False)
+
+    def test_on_notification_ignores_other_types(self, mocker):
+        """Test that non-mention notifications are not dispatched."""
+        bot = ScrabbleBot()
+        listener = ScrabbleListener(bot)
+        on_mention = mocker.patch.object(listener, "on_mention")
+        listener.notification_handlers['mention'] = on_mention
+
+        listener.on_notification({'type': 'favourite'})
+        on_mention.assert_not_called()
+
+        notification = {'type': 'mention'}
+        listener.on_notification(notification)
+        on_mention.assert_called_once_with(notification)
+
+    def test_on_update_monitoring_disabled(self, mocker):
+        """Test that updates are ignored when no account is monitored."""
+        bot = ScrabbleBot()
+        submit = mocker.patch.object(bot, "submit_status")
+
+        ScrabbleListener(bot).on_update({'account': {'id': 42, 'acct': 'bt_first_said'}})
+        submit.assert_not_called()
+
+
 class TestSmartMentionDetection:
     """Tests for should_ignore_mention method."""
 
@@ -290,7 +426,6 @@ class TestStateManagement:
         bot.save_state()
 
         # Read the file and check contents
-        import json
         with open(bot.last_ids_file) as f:
             data = json.load(f)
 
@@ -299,7 +434,6 @@ class TestStateManagement:
 
     def test_load_state(self, tmp_path):
         """Test loading state from file."""
-        import json
 
         state_file = tmp_path / "test_state.json"
         with open(state_file, "w") as f:
@@ -312,6 +446,124 @@ class TestStateManagement:
         assert bot.last_mention_id == 11111
         assert bot.last_bt_id == 22222
 
+    def test_flush_state_throttles_writes(self, tmp_path):
+        """Test that dirty state is only written once per save interval."""
+        bot = ScrabbleBot()
+        bot.last_ids_file = str(tmp_path / "test_state.json")
+        bot.state_save_interval = 60
+
+        bot.last_mention_id = 1
+        bot.state_dirty = True
+        bot.flush_state()
+        assert bot.state_dirty is False
+
+        bot.last_mention_id = 2
+        bot.state_dirty = True
+        bot.flush_state()
+        assert bot.state_dirty is True
+
+        with open(bot.last_ids_file) as f:
+            assert json.load(f)["mentions"] == 1
+
+        bot.flush_state(force=True)
+        with open(bot.last_ids_file) as f:
+            assert json.load(f)["mentions"] == 2
+
+    def test_points_cache_persists(self, tmp_path):
+        """Test that calculated points survive reopening the points cache."""
+        bot = ScrabbleBot()
+        bot.points_cache_file = str(tmp_path / "points_cache")
+        bot.open_points_cache()
+        assert bot.get_points("Hallo", "de") == (9, "de")
+        bot.close_points_cache()
+
+        bot = ScrabbleBot()
+        bot.points_cache_file = str(tmp_path / "points_cache")
+        bot.open_points_cache()
+        assert bot.points_cache_size == 1
+        assert bot.points_cache["de:Hallo"] == (9, "de")
+        bot.close_points_cache()
+
+    def test_points_cache_used_on_worker(self, tmp_path, mocker):
+        """Test that the points cache is opened, used and closed on the status worker."""
+        bot = ScrabbleBot()
+        bot.points_cache_file = str(tmp_path / "points_cache")
+        results = []
+        mocker.patch.object(
+            bot, "process_status",
+            side_effect=lambda status, **kwargs: results.append(bot.get_points(status["word"], "de"))
+        )
+        bot.executor.submit(bot.open_points_cache).result()
+
+        bot.submit_status({"id": 1, "word": "Hallo"}, is_mention=True, user_id="42")
+        bot.shutdown()
+
+        assert results == [(9, "de")]
+        assert bot.points_cache is None
+        bot.open_points_cache()
+        assert bot.points_cache["de:Hallo"] == (9, "de")
+        bot.close_points_cache()
+
+    def test_points_cache_cleared_when_tables_change(self, tmp_path, monkeypatch):
+        """Test that a points cache written with other scoring tables is discarded."""
+        import main
+        bot = ScrabbleBot()
+        bot.points_cache_file = str(tmp_path / "points_cache")
+        bot.open_points_cache()
+        bot.get_points("Hallo", "de")
+        bot.close_points_cache()
+
+        monkeypatch.setattr(main, "POINTS_CACHE_VERSION", "changed")
+        bot = ScrabbleBot()
+        bot.points_cache_file = str(tmp_path / "points_cache")
+        bot.open_points_cache()
+        assert bot.points_cache_size == 0
+        assert "de:Hallo" not in bot.points_cache
+        bot.close_points_cache()
+
+    def test_state_roundtrip_without_orjson(self, tmp_path, monkeypatch):
+        """Test that state persistence falls back to the stdlib json module."""
+        import main
+        monkeypatch.setattr(main, "orjson", None)
+
+        bot = ScrabbleBot()
+        bot.last_ids_file = str(tmp_path / "test_state.json")
+        bot.last_mention_id = 12345
+        bot.last_bt_id = 67890
+        bot.save_state()
+
+        bot = ScrabbleBot()
+        bot.last_ids_file = str(tmp_path / "test_state.json")
+        bot.load_state()
+        assert bot.last_mention_id == 12345
+        assert bot.last_bt_id == 67890
+
+    def test_flush_state_skips_unchanged_ids(self, tmp_path):
+        """Test that flushing does not write when the IDs match the saved ones."""
+        bot = ScrabbleBot()
+        bot.last_ids_file = str(tmp_path / "test_state.json")
+        bot.state_dirty = True
+
+        bot.flush_state(force=True)
+
+        assert bot.state_dirty is False
+        assert not (tmp_path / "test_state.json").exists()
+
+    def test_heartbeat_flushes_dirty_state(self, tmp_path):
+        """Test that stream heartbeats flush state once the save interval has passed."""
+        bot = ScrabbleBot()
+        bot.last_ids_file = str(tmp_path / "test_state.json")
+        bot.state_save_interval = 0
+        bot.last_mention_id = 12345
+        bot.state_dirty = True
+
+        ScrabbleListener(bot).handle_heartbeat()
+        bot.executor.shutdown(wait=True)
+
+        assert bot.state_dirty is False
+        with open(bot.last_ids_file) as f:
+            assert json.load(f)["mentions"] == 12345
+
     def test_load_state_missing_file(self):
         """Test loading state when file doesn't exist."""
         bot = ScrabbleBot()
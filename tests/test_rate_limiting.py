@@ -61,8 +61,9 @@ class TestRateLimiter:
         assert limiter.is_allowed("user1") is False
         assert limiter.is_allowed("user2") is False
 
-    def test_rate_limiter_sliding_window(self):
+    def test_rate_limiter_sliding_window(self, mocker):
         """Test that old requests are removed from sliding window."""
+        clock = mocker.patch("main.time.monotonic", return_value=1000.0)
         limiter = RateLimiter(max_requests=2, time_window=1, enabled=True)
 
         # Make 2 requests
@@ -72,14 +73,15 @@ class TestRateLimiter:
         # Should be rate limited
         assert limiter.is_allowed("user1") is False
 
-        # Wait for time window to pass
-        time.sleep(1.1)
+        # Advance the clock past the time window
+        clock.return_value += 1.1
 
         # Should be allowed again after window expires
         assert limiter.is_allowed("user1") is True
 
-    def test_rate_limiter_cleanup(self):
+    def test_rate_limiter_cleanup(self, mocker):
         """Test cleanup of old entries."""
+        clock = mocker.patch("main.time.monotonic", return_value=1000.0)
         limiter = RateLimiter(max_requests=5, time_window=1, enabled=True)
 
         # Add requests for multiple users
@@ -89,26 +91,27 @@ class TestRateLimiter:
 
         assert len(limiter.requests) == 3
 
-        # Wait for time window to pass
-        time.sleep(1.1)
+        # Advance the clock past the time window
+        clock.return_value += 1.1
 
         # Cleanup should remove all old entries
         limiter.cleanup_old_entries()
         assert len(limiter.requests) == 0
 
-    def test_rate_limiter_partial_cleanup(self):
+    def test_rate_limiter_partial_cleanup(self, mocker):
         """Test cleanup removes only old entries."""
+        clock = mocker.patch("main.time.monotonic", return_value=1000.0)
         limiter = RateLimiter(max_requests=5, time_window=2, enabled=True)
 
         # Add request for user1
         limiter.is_allowed("user1")
-        time.sleep(1)
+        clock.return_value += 1
 
         # Add request for user2 (newer)
         limiter.is_allowed("user2")
 
-        # Wait so user1's request expires but user2's doesn't
-        time.sleep(1.5)
+        # Advance so user1's request expires but user2's doesn't
+        clock.return_value += 1.5
 
         limiter.cleanup_old_entries()
 
@@ -120,14 +123,25 @@ class TestRateLimiter:
         """Test that timestamps are correctly tracked."""
         limiter = RateLimiter(max_requests=3, time_window=60, enabled=True)
 
-        start_time = time.time()
+        start_time = time.monotonic()
         limiter.is_allowed("user1")
         limiter.is_allowed("user1")
 
         # Check that 2 timestamps were recorded
         assert len(limiter.requests["user1"]) == 2
 
-        # Check timestamps are recent
+        # Check timestamps are recent (on the monotonic clock)
         for timestamp in limiter.requests["user1"]:
             assert timestamp >= start_time
-            assert timestamp <= time.time()
+            assert timestamp <= time.monotonic()
+
+    def test_rate_limiter_max_users_evicts_least_recent(self):
+        """Test that the least recently active user is evicted beyond max_users."""
+        limiter = RateLimiter(max_requests=5, time_window=60, enabled=True, max_users=2)
+
+        limiter.is_allowed("user1")
+        limiter.is_allowed("user2")
+        limiter.is_allowed("user1")  # user1 is now the most recently active
+        limiter.is_allowed("user3")
+
+        assert list(limiter.requests) == ["user1", "user3"]
@@ -2,6 +2,8 @@
 
 import pytest
 from scrabble import (
+    LETTER_POINTS,
+    SUPPORTED_LANGUAGES,
     calculate_points,
     get_language_name,
     get_response_template,
@@ -43,13 +45,21 @@ class TestCalculatePoints:
         points, lang = calculate_points("house")
         # Language detection might vary, just check it returns something
         assert points > 0
-        assert lang in ["en", "de", "fr", "es", "it", "nl", "pl", "pt", "ru", "sv", "tr"]
+        assert lang in SUPPORTED_LANGUAGES
 
     def test_empty_word(self):
         """Test empty word returns 0 points."""
         points, lang = calculate_points("", "de")
         assert points == 0
 
+    def test_results_are_cached(self):
+        """Test that repeated calls are served from the cache."""
+        calculate_points.cache_clear()
+        first = calculate_points("Scrabble", "en")
+        second = calculate_points("Scrabble", "en")
+        assert first == second
+        assert calculate_points.cache_info().hits == 1
+
     def test_case_insensitive(self):
         """Test that calculation is case insensitive."""
         points1, lang1 = calculate_points("HELLO", "en")
@@ -57,6 +67,12 @@ class TestCalculatePoints:
         assert points1 == points2
         assert lang1 == lang2
 
+    def test_ascii_fast_path_matches_letter_table(self):
+        """Test that ASCII words score the same as a per-letter lookup."""
+        for language, points_map in LETTER_POINTS.items():
+            expected = sum(points_map.get(char, 0) for char in "QUIZ-WORD")
+            assert calculate_points("Quiz-word", language) == (expected, language)
+
 
 class TestLanguageDetection:
     """Tests for language detection functions."""